@@ -0,0 +1,8 @@
+from peerscout import main
+
+
+def before_scenario(context, scenario):
+    """Start every scenario with empty lookup caches."""
+    main._GEO_CACHE.clear()
+    main._load_geo_cache.cache_clear()
+    main._RESPONSE_MEMO.clear()
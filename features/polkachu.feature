@@ -18,6 +18,26 @@ Feature: PeerScout Tests
     And the location of the peer is: GB
     Then the number of peers I expect to receive is: 0
 
+  Scenario: Validate peer outside our target countries is never probed for latency
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And I specify the target countries: US
+    And I specify the maximum allowed latency to: 150ms
+    And the location of the peer is: GB
+    And the location lookup takes: 100ms
+    And the latency of the peer is: 100ms
+    Then the number of peers I expect to receive is: 0
+    And no peers are probed for latency
+
+  Scenario: Validate peer from any country is accepted with a wildcard
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And I specify the target countries: *
+    And I specify the maximum allowed latency to: 150ms
+    And the location of the peer is: GB
+    And the latency of the peer is: 100ms
+    Then the number of peers I expect to receive is: 1
+
   Scenario: Validate peer is outside our required parameters (latency)
     Given the polkachu API returns the following chains: axelar,cosmos,dydx
     When I specify the network: cosmos
@@ -27,15 +47,150 @@ Feature: PeerScout Tests
     And the latency of the peer is: 100ms
     Then the number of peers I expect to receive is: 0
 
-@wip
-  Scenario: Validate peer has ICMP blocked, but can be reached via TCP
+  Scenario: Validate peer is rejected when its p2p port is closed
     Given the polkachu API returns the following chains: axelar,cosmos,dydx
     When I specify the network: cosmos
     And I specify the target countries: CA,US
+    And the location of the peer is: US
+    And the peer refuses TCP connections
+    Then the number of peers I expect to receive is: 0
+
+  Scenario: Validate peer located by an IPinfo geo database is within our required parameters
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And I specify the target countries: CA,US
+    And I specify the maximum allowed latency to: 150ms
+    And the location of the peer is: GB
+    And the local geo database places the peer in: US using the IPinfo layout
+    And the latency of the peer is: 100ms
+    Then the number of peers I expect to receive is: 1
+
+  Scenario: Validate peer located by a MaxMind geo database is within our required parameters
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And I specify the target countries: CA,US
+    And I specify the maximum allowed latency to: 150ms
+    And the location of the peer is: GB
+    And the local geo database places the peer in: US using the MaxMind layout
+    And the latency of the peer is: 100ms
+    Then the number of peers I expect to receive is: 1
+
+  Scenario: Validate peers on private or unspecified addresses are rejected
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And I specify the target countries: *
+    And I specify the maximum allowed latency to: 150ms
+    And polkachu returns the following live peers: node1@10.0.0.1:26656,node2@192.168.1.10:26656,node3@0.0.0.0:26656
+    And the location of the peer is: CA
+    And the latency of the peer is: 100ms
+    Then the number of peers I expect to receive is: 0
+
+  Scenario: Validate malformed peers are skipped
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And I specify the target countries: CA,US
+    And I specify the maximum allowed latency to: 150ms
+    And polkachu returns the following live peers: not-a-peer,node1@8.8.8.8:26656
+    And the location of the peer is: CA
+    And the latency of the peer is: 100ms
+    Then the number of peers I expect to receive is: 1
+
+  Scenario: Validate peers sharing an IP are only returned once
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And I specify the target countries: CA,US
+    And I specify the maximum allowed latency to: 150ms
+    And polkachu returns the following live peers: node1@8.8.8.8:26656,node2@8.8.8.8:26657
+    And the location of the peer is: CA
+    And the latency of the peer is: 100ms
+    Then the number of peers I expect to receive is: 1
+
+  Scenario: Validate peers in one network block are located with a single IPinfo lookup
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And I specify the target countries: CA,US
+    And I specify the maximum allowed latency to: 150ms
+    And polkachu returns 2 live peers in the network block: 9.9.9
+    And the location of the peer is: CA
+    And the latency of the peer is: 100ms
+    Then the number of peers I expect to receive is: 2
+    And IPinfo is asked to locate 1 IPs in 1 lookups
+
+  Scenario: Validate locations persisted by an earlier run are reused
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And caching is enabled
+    And I specify the target countries: CA,US
+    And I specify the maximum allowed latency to: 150ms
+    And the location of the peer is: CA
+    And the latency of the peer is: 100ms
+    And the in-memory location cache is cleared
+    And the latency of the peer is: 100ms
+    Then the number of peers I expect to receive is: 1
+    And IPinfo is asked to locate 0 IPs in 0 lookups
+
+  Scenario: Validate a network block is never split across IPinfo lookups
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And I specify the desired number of peers: 25
+    And I specify the target countries: CA,US
+    And I specify the maximum allowed latency to: 150ms
+    And polkachu returns 13 live peers in separate network blocks
+    And polkachu returns 12 live peers in the network block: 30.7.7
+    And the location of the peer is: CA
+    And the location lookup takes: 100ms
+    And the latency of the peer is: 100ms
+    Then the number of peers I expect to receive is: 25
+    And no network block is split across IPinfo lookups
+
+  Scenario: Validate recent peers are reused when the earlier run was as strict about location
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And caching is enabled
+    And I specify the desired number of peers: 1
+    And I specify the target countries: CA
+    And I specify the maximum allowed latency to: 150ms
+    And the location of the peer is: CA
+    And the latency of the peer is: 100ms
+    And I specify the target countries: CA,US
+    Then the number of recent peers I expect to reuse is: 1
+
+  Scenario: Validate recent peers are not reused when the earlier run was less strict about location
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And caching is enabled
+    And I specify the desired number of peers: 1
+    And I specify the target countries: CA,US
+    And I specify the maximum allowed latency to: 150ms
+    And the location of the peer is: CA
+    And the latency of the peer is: 100ms
+    And I specify the target countries: CA
+    Then the number of recent peers I expect to reuse is: 0
+
+  Scenario: Validate recent peers are not reused for a stricter latency limit
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And caching is enabled
+    And I specify the desired number of peers: 1
+    And I specify the target countries: CA
+    And I specify the maximum allowed latency to: 150ms
+    And the location of the peer is: CA
+    And the latency of the peer is: 100ms
     And I specify the maximum allowed latency to: 50ms
-    And the peer responds with a Host Timeout
-    And I attempt to connect to the peer via TCP
+    Then the number of recent peers I expect to reuse is: 0
+
+  Scenario: Validate recent peers that were never located are not reused for a country filter
+    Given the polkachu API returns the following chains: axelar,cosmos,dydx
+    When I specify the network: cosmos
+    And caching is enabled
+    And no IPinfo access token is set
+    And I specify the desired number of peers: 1
+    And I specify the target countries: CA,US
+    And I specify the maximum allowed latency to: 150ms
+    And the location of the peer is: GB
+    And the latency of the peer is: 100ms
     Then the number of peers I expect to receive is: 1
+    And the number of recent peers I expect to reuse is: 0
 
   Scenario: Validate incorrect network being used
     Given the polkachu API returns the following chains: axelar,cosmos
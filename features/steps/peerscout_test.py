@@ -1,9 +1,12 @@
 import logging
-from unittest.mock import patch
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, PropertyMock, patch
 
-import ping3
 from behave import given, then, when
 
+from peerscout import main
 from peerscout.main import Config, Data, Filter, PeerConfig, PeerEndpoint
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
@@ -32,36 +35,117 @@ def step_impl(context, chains):
     mock_data = chains.split(",")
     with patch("peerscout.main.Data._fetch_data", return_value=mock_data):
         context.valid_chains = data.fetch_valid_chains()
-        logging.debug(f"{chains} network are assumed available for testing.")
+        logging.debug("%s network are assumed available for testing.", chains)
 
 
 @when("I specify the network: {chain}")
 def step_impl(context, chain):
     context.peer_config.peers.network = chain
-    logging.debug(f"Network set to: {chain}")
+    logging.debug("Network set to: %s", chain)
 
 
 @when("I specify the target countries: {countries}")
 def step_impl(context, countries):
     """Update the configuration with the list of target countries."""
-    context.peer_config.peers.target_countries = countries.split(",")
-    logging.debug(f"Target countries set to: {countries}")
+    context.peer_config.peers.target_countries = frozenset(countries.split(","))
+    logging.debug("Target countries set to: %s", countries)
 
 
 @when("I specify the maximum allowed latency to: {latency}ms")
 def step_impl(context, latency):
     """Set the maximum allowed latency (in milliseconds) in our configuration."""
     context.peer_config.peers.max_latency = float(latency)
-    logging.debug(f"Maximum allowed latency set to: {latency}ms")
+    logging.debug("Maximum allowed latency set to: %sms", latency)
+
+
+@when("I specify the desired number of peers: {count}")
+def step_impl(context, count):
+    context.peer_config.peers.desired_count = int(count)
+    logging.debug("Desired peer count set to: %s", count)
+
+
+@when("no IPinfo access token is set")
+def step_impl(context):
+    context.peer_config.peers.access_token = ""
+    logging.debug("IPinfo access token removed")
+
+
+@when("caching is enabled")
+def step_impl(context):
+    """Enable the on-disk caches, pointing them at a directory private to this scenario."""
+    cache_dir = tempfile.TemporaryDirectory()
+    context.add_cleanup(cache_dir.cleanup)
+    for name, path in (("CACHE_DIR", Path(cache_dir.name)), ("GEO_CACHE_FILE", Path(cache_dir.name) / "geo.json")):
+        patcher = patch.object(main, name, path)
+        patcher.start()
+        context.add_cleanup(patcher.stop)
+    context.peer_config.use_cache = True
+    logging.debug("Caching enabled in: %s", cache_dir.name)
+
+
+@when("polkachu returns the following live peers: {peers}")
+def step_impl(context, peers):
+    """Replace the single default peer with the given comma-separated live peers."""
+    context.live_peers = peers.split(",")
+    logging.debug("Live peers set to: %s", peers)
+
+
+@when("the local geo database places the peer in: {country} using the {layout} layout")
+def step_impl(context, country, layout):
+    """Serve peer locations from a fake MMDB reader, using the record layout of IPinfo or MaxMind databases."""
+    records = {
+        "IPinfo": {"country": "Full Country Name", "country_code": country},
+        "MaxMind": {"country": {"iso_code": country, "names": {"en": "Full Country Name"}}},
+    }
+    reader = MagicMock()
+    reader.get.return_value = records[layout]
+    patcher = patch.object(Filter, "geo_reader", new_callable=PropertyMock, return_value=reader)
+    patcher.start()
+    context.add_cleanup(patcher.stop)
+    context.peer_config.peers.geo_database = "test.mmdb"
+    logging.debug("Geo database set to place the peer in %s using the %s layout", country, layout)
+
+
+@when("the location lookup takes: {delay}ms")
+def step_impl(context, delay):
+    """Slow down the mocked IPinfo batch so that it completes after any probes started alongside it."""
+    context.lookup_delay = float(delay) / 1000
+    logging.debug("Location lookup delay set to: %sms", delay)
 
 
 @when("the location of the peer is: {country}")
 def step_impl(context, country):
     """Update the configuration with peer country."""
     context.peer_location = {
-        "203.0.113.1": {"country": country},
+        "8.8.8.8": {"country": country},
     }
-    logging.debug(f"Peer created with country set to: {country}")
+    context.peer_country = country
+    logging.debug("Peer created with country set to: %s", country)
+
+
+@when("polkachu returns {count} live peers in the network block: {block}")
+def step_impl(context, count, block):
+    """Add live peers sharing one /24, e.g. block 9.9.9 gives 9.9.9.1, 9.9.9.2 and so on."""
+    context.live_peers = getattr(context, "live_peers", []) + [
+        f"node-{block}-{i}@{block}.{i + 1}:26656" for i in range(int(count))
+    ]
+    logging.debug("Added %s live peers in network block: %s", count, block)
+
+
+@when("polkachu returns {count} live peers in separate network blocks")
+def step_impl(context, count):
+    context.live_peers = getattr(context, "live_peers", []) + [
+        f"node-{i}@{20 + i}.{i}.0.1:26656" for i in range(int(count))
+    ]
+    logging.debug("Added %s live peers in separate network blocks", count)
+
+
+@when("the in-memory location cache is cleared")
+def step_impl(context):
+    """Start location lookups afresh, as a new process would, leaving only the on-disk cache."""
+    main._GEO_CACHE.clear()
+    main._load_geo_cache.cache_clear()
+    logging.debug("In-memory location cache cleared")
 
 
 @when("the latency of the peer is: {latency}ms")
@@ -69,24 +153,51 @@ def step_impl(context, latency):
     max_latency = float(context.peer_config.peers.max_latency)
     peer_latency = float(latency)
 
-    with patch("ping3.ping", return_value=peer_latency), patch("ipinfo.getHandler") as mock_handler:
-        mock_handler.return_value.getBatchDetails.return_value = context.peer_location
+    with (
+        patch("peerscout.main._tcp_latency", return_value=peer_latency) as mock_probe,
+        patch("ipinfo.getHandler") as mock_handler,
+    ):
 
-        dummy_peers = ["node1@203.0.113.1:26656"]
+        def batch_details(ips, **_):
+            time.sleep(getattr(context, "lookup_delay", 0))
+            return {ip: {"country": context.peer_country} for ip in ips}
+
+        mock_handler.return_value.getBatchDetails.side_effect = batch_details
+
+        dummy_peers = getattr(context, "live_peers", ["node1@8.8.8.8:26656"])
         context.dummy_peers = dummy_peers
 
         filter_instance = Filter(context.peer_config)
         valid_peers = filter_instance.filter_peers(dummy_peers)
+        context.probed_addresses = [probe.args[0] for probe in mock_probe.call_args_list]
+        context.located_batches = [
+            lookup.args[0] for lookup in mock_handler.return_value.getBatchDetails.call_args_list
+        ]
         if valid_peers:
             context.valid_peers = valid_peers
 
         for peer_str in valid_peers:
             peer = PeerEndpoint.from_string(peer_str)
-            latency_val = ping3.ping(peer.ip, timeout=max_latency / 1000, unit="ms")
+            latency_val = main._tcp_latency(peer.ip, peer.port, max_latency / 1000)
             assert latency_val <= max_latency, (
                 f"Peer {peer_str} reported latency {latency_val}ms, which exceeds the allowed {max_latency}ms"
             )
-    logging.debug(f"Peer created with latency set to: {latency}ms")
+    logging.debug("Peer created with latency set to: %sms", latency)
+
+
+@when("the peer refuses TCP connections")
+def step_impl(context):
+    with (
+        patch("peerscout.main._tcp_latency", side_effect=ConnectionRefusedError),
+        patch("ipinfo.getHandler") as mock_handler,
+    ):
+        mock_handler.return_value.getBatchDetails.return_value = context.peer_location
+
+        filter_instance = Filter(context.peer_config)
+        valid_peers = filter_instance.filter_peers(["node1@8.8.8.8:26656"])
+        if valid_peers:
+            context.valid_peers = valid_peers
+    logging.debug("Peer created with its p2p port closed")
 
 
 @then("the number of peers I expect to receive is: {count}")
@@ -97,8 +208,39 @@ def step_impl(context, count):
         assert not hasattr(context, "valid_peers"), "Valid peers data should not be found in context."
     else:
         assert hasattr(context, "valid_peers"), "Valid peers data not found in context."
-        assert len(context.valid_peers) > 0, "No valid peers were returned after filtering."
-        logging.debug(f"Valid peers returned: {context.valid_peers}")
+        assert len(context.valid_peers) == count, f"Expected {count} peers, got {context.valid_peers}"
+        logging.debug("Valid peers returned: %s", context.valid_peers)
+
+
+@then("the number of recent peers I expect to reuse is: {count}")
+def step_impl(context, count):
+    """Verify how many peers qualified by the earlier run are reused for the current criteria."""
+    recent_peers = Filter(context.peer_config).recent_peers()
+    assert len(recent_peers) == int(count), f"Expected {count} recent peers, got {recent_peers}"
+
+
+@then("no peers are probed for latency")
+def step_impl(context):
+    """Verify that peers placed outside the target countries never reach the latency probe."""
+    assert not context.probed_addresses, f"Expected no latency probes, got {context.probed_addresses}"
+
+
+@then("IPinfo is asked to locate {count} IPs in {lookups} lookups")
+def step_impl(context, count, lookups):
+    """Verify how many IPinfo batch requests the last filtering run made, and how many IPs they covered."""
+    assert len(context.located_batches) == int(lookups), f"Expected {lookups} lookups, got {context.located_batches}"
+    located = sum(len(batch) for batch in context.located_batches)
+    assert located == int(count), f"Expected {count} IPs to be located, got {context.located_batches}"
+
+
+@then("no network block is split across IPinfo lookups")
+def step_impl(context):
+    lookups_by_block = {}
+    for index, batch in enumerate(context.located_batches):
+        for ip in batch:
+            lookups_by_block.setdefault(main._geo_block(ip), set()).add(index)
+    split_blocks = [block for block, lookups in lookups_by_block.items() if len(lookups) > 1]
+    assert not split_blocks, f"Network blocks located by more than one lookup: {split_blocks}"
 
 
 @then("I should receive an error")
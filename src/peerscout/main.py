@@ -3,22 +3,76 @@
 Uses the Polkachu API to fetch live peers and filters them based on specified criteria.
 """
 
-import difflib
+import functools
+import hashlib
+import ipaddress
+import itertools
+import json
 import logging
+import os
 import re
 import socket
 import sys
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
 from operator import itemgetter
-from typing import TypedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, TypedDict
 
 import configargparse
-import ipinfo
-import ping3
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
-# Enable exceptions mode for ping3
-ping3.EXCEPTIONS = True
+if TYPE_CHECKING:
+    import ipinfo
+    import maxminddb
+
+# Separators accepted between target countries (e.g. 'CA,US' or 'CA US')
+COUNTRY_SEPARATOR_RE = re.compile(r"[\s,]+")
+
+# nodeID@ip:port, matching the port on the last colon so bare IPv6 addresses parse
+PEER_ENDPOINT_RE = re.compile(r"^(?P<node_id>[^@]+)@(?P<ip>.+):(?P<port>\d+)$")
+
+# Addresses peers advertise when they are not exposing their real p2p address
+LOCALHOST_ADDRESSES = frozenset({"127.0.0.1", "localhost", "::1", "0.0.0.0"})  # noqa: S104
+
+# Upper bound on concurrent latency probes
+MAX_PROBE_WORKERS = 32
+
+# How long a resolved IP -> country mapping is trusted, in seconds
+GEO_CACHE_TTL = 7 * 24 * 60 * 60
+
+# IPinfo's per-request batch limit, and the overall budget for resolving one set of peers, in seconds
+IPINFO_BATCH_SIZE = 1000
+IPINFO_BATCH_TIMEOUT = 30
+
+# Peers are located in small concurrent batches so a probe only waits on the lookup covering its own peer
+COUNTRY_LOOKUP_BATCH_SIZE = 10
+COUNTRY_LOOKUP_WORKERS = 4
+
+# Least-recently-used IP or network block -> (country, resolved at) cache shared across lookups
+GEO_CACHE_MAXSIZE = 4096
+_GEO_CACHE: OrderedDict[str, tuple[str | None, float]] = OrderedDict()
+_GEO_CACHE_LOCK = threading.Lock()
+
+# On-disk cache for near-static Polkachu responses, and how long each is trusted, in seconds
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "peerscout"
+CHAINS_CACHE_TTL = 24 * 60 * 60
+CHAIN_DETAILS_CACHE_TTL = 60 * 60
+
+# URL -> (response, fetched at), shared by every Data instance so a long-lived process asks Polkachu once per TTL
+_RESPONSE_MEMO: dict[str, tuple[dict, float]] = {}
+
+# Country lookups persisted across runs
+GEO_CACHE_FILE = CACHE_DIR / "geo.json"
+
+# How long peers qualified by one run are reused by the next, in seconds
+RECENT_PEERS_TTL = 10 * 60
 
 
 class UnsupportedNetworkError(ValueError):
@@ -57,7 +111,7 @@ class PolkachuServices(TypedDict):
     live_peers: PolkachuService
 
 
-@dataclass
+@dataclass(slots=True)
 class PeerEndpoint:
     """Represents a peer endpoint with parsed components."""
 
@@ -68,16 +122,18 @@ class PeerEndpoint:
     @classmethod
     def from_string(cls, endpoint: str) -> "PeerEndpoint":
         """Parse peer endpoint string."""
-        node_id, address = endpoint.split("@")
-        ip, port = address.split(":")
-        return cls(node_id=node_id, ip=ip, port=int(port))
+        match = PEER_ENDPOINT_RE.match(endpoint)
+        if not match:
+            msg = f"Invalid peer endpoint: {endpoint!r}"
+            raise ValueError(msg)
+        return cls(node_id=match["node_id"], ip=match["ip"], port=int(match["port"]))
 
     def __str__(self) -> str:
         """Convert back to nodeID@ip:port format."""
         return f"{self.node_id}@{self.ip}:{self.port}"
 
 
-@dataclass
+@dataclass(slots=True)
 class ChainDetails:
     """Details about a blockchain network from Polkachu API.
 
@@ -105,7 +161,7 @@ class ChainDetails:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ChainLivePeers:
     """Details about a blockchain network's live peers from Polkachu API.
 
@@ -126,31 +182,34 @@ class ChainLivePeers:
         return cls(network=data["network"], polkachu_peer=data["polkachu_peer"], live_peers=data["live_peers"])
 
 
-@dataclass
+@dataclass(slots=True)
 class PeerConfig:
     """Configuration for peer filtering.
 
     Attributes:
         network: Network identifier (e.g., "cosmos")
-        target_countries: List of target countries (e.g., ['CA', 'US'])
+        target_countries: Set of upper-cased target country codes (e.g., {'CA', 'US'})
         max_latency: Maximum acceptable latency in milliseconds
         desired_count: Number of peers to find
         max_attempts: Maximum number of attempts to find peers
+        access_token: IPinfo API access token
+        geo_database: Optional path to a local MMDB country database checked before IPinfo
 
     """
 
     network: str
-    target_countries: list[str]
+    target_countries: frozenset[str]
     max_latency: float
     desired_count: int
     max_attempts: int
     access_token: str
+    geo_database: str | None = None
 
     def __post_init__(self) -> None:
         """Clean up target countries after initialisation."""
         combined = " ".join(self.target_countries)
-        split_countries = re.split(r"[\s,]+", combined)
-        self.target_countries = [country.strip() for country in split_countries if country.strip()]
+        split_countries = COUNTRY_SEPARATOR_RE.split(combined)
+        self.target_countries = frozenset(country.strip().upper() for country in split_countries if country.strip())
 
     @classmethod
     def from_args(cls, args: configargparse.Namespace) -> "PeerConfig":
@@ -162,9 +221,94 @@ class PeerConfig:
             desired_count=args.desired_count,
             max_attempts=args.max_attempts,
             access_token=args.access_token,
+            geo_database=args.geo_database,
         )
 
 
+@functools.cache
+def _build_parser() -> configargparse.ArgParser:
+    """Build the command line parser once and reuse it for every parse."""
+    parser = configargparse.ArgParser(
+        config_file_parser_class=configargparse.YAMLConfigFileParser,
+        default_config_files=["config.yaml"],
+        description="A tool for gathering and filtering peers for a given network from Polkachu.",
+        add_help=True,
+    )
+
+    parser.add("-c", "--config", required=False, is_config_file=True, help="config file path")
+    parser.add_argument("--network", type=str, required=True, env_var="NETWORK", help="The network to scout peers for")
+    parser.add_argument(
+        "--target_countries",
+        type=str,
+        nargs="*",
+        default=["CA", "US"],
+        required=False,
+        env_var="TARGET_COUNTRIES",
+        help=(
+            "List of target countries. Can be comma or space separated (e.g. 'CA,US,GB' or 'CA US GB'). "
+            "Use '*' or an empty value to accept peers from any country."
+        ),
+    )
+    parser.add_argument(
+        "--desired_count",
+        type=int,
+        default=5,
+        required=False,
+        env_var="DESIRED_COUNT",
+        help="The desired number of peers to find",
+    )
+    parser.add_argument(
+        "--max_latency",
+        type=int,
+        default=50,
+        required=False,
+        env_var="MAX_LATENCY",
+        help="The maximum latency in milliseconds",
+    )
+    parser.add_argument(
+        "--max_attempts",
+        type=int,
+        default=5,
+        required=False,
+        env_var="MAX_ATTEMPTS",
+        help="The maximum number of attempts to find peers",
+    )
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        type=str,
+        choices=["list", "string"],
+        default="list",
+        env_var="FORMAT",
+        help="Output format (list/string)",
+    )
+    parser.add_argument(
+        "--access_token",
+        type=str,
+        required=False,
+        env_var="ACCESS_TOKEN",
+        help="IPinfo API access token",
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        env_var="NO_CACHE",
+        help=(
+            "Bypass the on-disk caches: Polkachu chain data, IP country lookups, and the peers "
+            "qualified by a run in the last 10 minutes, which are otherwise returned without any new checks"
+        ),
+    )
+    parser.add_argument(
+        "--geo_database",
+        type=str,
+        required=False,
+        env_var="GEO_DATABASE",
+        help="Path to a local MMDB country database (e.g. IPinfo Country or GeoLite2 Country) checked before IPinfo",
+    )
+    parser.add_argument("-d", "--debug", action="store_true", help="Enable debug logging.")
+    return parser
+
+
 class Config:
     """Configuration for the peer scout."""
 
@@ -173,78 +317,19 @@ class Config:
         debug: bool,  # noqa: FBT001
         peers: PeerConfig,
         output_format: str,
+        *,
+        use_cache: bool = False,
     ) -> None:
         """Initialise configuration with monitoring parameters."""
         self.debug = debug
         self.peers = peers
         self.output_format = output_format
+        self.use_cache = use_cache
 
     @classmethod
     def parse_args(cls) -> configargparse.Namespace:
         """Parse command line arguments."""
-        parser = configargparse.ArgParser(
-            config_file_parser_class=configargparse.YAMLConfigFileParser,
-            default_config_files=["config.yaml"],
-            description="A tool for gathering and filtering peers for a given network from Polkachu.",
-            add_help=True,
-        )
-
-        parser.add("-c", "--config", required=False, is_config_file=True, help="config file path")
-        parser.add_argument(
-            "--network", type=str, required=True, env_var="NETWORK", help="The network to scout peers for"
-        )
-        parser.add_argument(
-            "--target_countries",
-            type=str,
-            nargs="*",
-            default=["CA", "US"],
-            required=False,
-            env_var="TARGET_COUNTRIES",
-            help="List of target countries. Can be comma or space separated (e.g. 'CA,US,GB' or 'CA US GB').",
-        )
-        parser.add_argument(
-            "--desired_count",
-            type=int,
-            default=5,
-            required=False,
-            env_var="DESIRED_COUNT",
-            help="The desired number of peers to find",
-        )
-        parser.add_argument(
-            "--max_latency",
-            type=int,
-            default=50,
-            required=False,
-            env_var="MAX_LATENCY",
-            help="The maximum latency in milliseconds",
-        )
-        parser.add_argument(
-            "--max_attempts",
-            type=int,
-            default=5,
-            required=False,
-            env_var="MAX_ATTEMPTS",
-            help="The maximum number of attempts to find peers",
-        )
-        parser.add_argument(
-            "--format",
-            dest="output_format",
-            type=str,
-            choices=["list", "string"],
-            default="list",
-            env_var="FORMAT",
-            help="Output format (list/string)",
-        )
-        parser.add_argument(
-            "--access_token",
-            type=str,
-            required=False,
-            env_var="ACCESS_TOKEN",
-            help="IPinfo API access token",
-        )
-        parser.add_argument("-d", "--debug", action="store_true", help="Enable debug logging.")
-
-        args = parser.parse_args()
+        args = _build_parser().parse_args()
         logging.debug("All config values: %s", args)
         return args
 
@@ -272,6 +357,7 @@ class Config:
             debug=args.debug,
             peers=PeerConfig.from_args(args),
             output_format=args.output_format,
+            use_cache=not args.no_cache,
         )
 
 
@@ -283,48 +369,126 @@ class Data:
         self.config = config
         self.base_url = base_url
 
-    def _fetch_data(self, endpoint: str) -> dict:
-        """Retrieve data from the Polkachu API."""
-        import requests
+        # Share one pooled keep-alive connection across every Polkachu call
+        self._session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        self._session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retries))
+
+    def __enter__(self) -> "Data":
+        """Return the client for use as a context manager."""
+        return self
 
+    def __exit__(self, *_: object) -> None:
+        """Close the HTTP session when leaving the context manager."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying HTTP session."""
+        self._session.close()
+
+    def _fetch_data(self, endpoint: str, *, quiet: bool = False) -> dict:
+        """Retrieve data from the Polkachu API, only logging failures at debug level if `quiet` is set."""
         url = f"{self.base_url}/{endpoint}"
 
         try:
-            response = requests.get(url, timeout=15)
+            response = self._session.get(url, timeout=15)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
-            logging.warning("Error fetching data from %s: %s", url, e)
+            (logging.debug if quiet else logging.warning)("Error fetching data from %s: %s", url, e)
             return {}
 
-    def fetch_valid_chains(self) -> list[str]:
-        """Retrieve a list of chains supported by Polkachu."""
-        return self._fetch_data("api/v2/chains")
+    def _fetch_cached_data(self, endpoint: str, ttl: float, *, refresh: bool = False, quiet: bool = False) -> dict:
+        """Retrieve near-static data, preferring the in-process and on-disk caches over the Polkachu API.
+
+        Args:
+            endpoint: API endpoint to retrieve.
+            ttl: How long a cached response is trusted, in seconds.
+            refresh: Skip any cached copy and replace it with a fresh response.
+            quiet: Only log a failed request at debug level.
+
+        """
+        url = f"{self.base_url}/{endpoint}"
+        memo = _RESPONSE_MEMO.get(url)
+        if memo and not refresh and time.time() - memo[1] < ttl:
+            return memo[0]
+
+        cache_file = CACHE_DIR / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+        if self.config.use_cache and not refresh:
+            try:
+                fetched_at = cache_file.stat().st_mtime
+                if time.time() - fetched_at < ttl:
+                    data = json.loads(cache_file.read_text())
+                    logging.debug("Using cached response for %s", url)
+                    _RESPONSE_MEMO[url] = (data, fetched_at)
+                    return data
+            except (OSError, ValueError):
+                pass
+
+        data = self._fetch_data(endpoint, quiet=quiet)
+        if data:
+            _RESPONSE_MEMO[url] = (data, time.time())
+            if self.config.use_cache:
+                try:
+                    cache_file.parent.mkdir(parents=True, exist_ok=True)
+                    cache_file.write_text(json.dumps(data))
+                except OSError as e:
+                    logging.debug("Unable to write cache file %s: %s", cache_file, e)
+        return data
+
+    def fetch_valid_chains(self, *, refresh: bool = False) -> list[str]:
+        """Retrieve a list of chains supported by Polkachu, optionally bypassing the cache."""
+        return self._fetch_cached_data("api/v2/chains", ttl=CHAINS_CACHE_TTL, refresh=refresh)
 
     def fetch_chain_details(self) -> ChainDetails:
         """Retrieve detailed information of a chain."""
-        data = self._fetch_data(f"api/v2/chains/{self.config.peers.network}")
+        data = self._fetch_cached_data(f"api/v2/chains/{self.config.peers.network}", ttl=CHAIN_DETAILS_CACHE_TTL)
         return ChainDetails.from_dict(data)
 
-    def fetch_live_peers(self) -> ChainLivePeers:
-        """Retrieve live peers of a chain."""
-        unique_peers = set()
+    def prefetch_chain_details(self) -> None:
+        """Warm the cache used by `fetch_chain_details` before the network is validated, without warning on failure."""
+        self._fetch_cached_data(f"api/v2/chains/{self.config.peers.network}", ttl=CHAIN_DETAILS_CACHE_TTL, quiet=True)
+
+    def prefetch_live_peers(self) -> dict:
+        """Make one live peers request before the network is validated, without warning on failure."""
+        return self._fetch_data(f"api/v2/chains/{self.config.peers.network}/live_peers", quiet=True)
+
+    def fetch_live_peers(self, prefetched: "Future[dict] | None" = None) -> ChainLivePeers:
+        """Retrieve live peers of a chain, issuing every attempt concurrently.
+
+        Args:
+            prefetched: A request from `prefetch_live_peers`, counted as one of the attempts.
+
+        """
+        endpoint = f"api/v2/chains/{self.config.peers.network}/live_peers"
+        unique_peers: dict[str, None] = {}
         peer_amount = 25
-        attempts = 0
         last_data = None
 
-        while attempts < self.config.peers.max_attempts and len(unique_peers) < peer_amount:
-            data = self._fetch_data(f"api/v2/chains/{self.config.peers.network}/live_peers")
-            if "live_peers" in data:
-                last_data = data
-                unique_peers.update(data["live_peers"])
-                logging.debug("Found %d unique peers out of %d desired", len(unique_peers), peer_amount)
-            attempts += 1
+        # Each call returns a random subset of peers, so the attempts are independent of each other
+        attempts = self.config.peers.max_attempts - (1 if prefetched is not None else 0)
+        executor = ThreadPoolExecutor(max_workers=max(1, attempts))
+        futures = [executor.submit(self._fetch_data, endpoint) for _ in range(attempts)]
+        if prefetched is not None:
+            futures.append(prefetched)
+        try:
+            for future in as_completed(futures):
+                data = future.result()
+                if "live_peers" in data:
+                    last_data = data
+                    unique_peers.update(dict.fromkeys(data["live_peers"]))
+                    logging.debug("Found %d unique peers out of %d desired", len(unique_peers), peer_amount)
+                    if len(unique_peers) >= peer_amount:
+                        break
+        finally:
+            # Responses still in flight are not needed once enough peers have been collected
+            executor.shutdown(wait=False, cancel_futures=True)
 
         if not last_data:
             return ChainLivePeers(network=self.config.peers.network, polkachu_peer="", live_peers=[])
 
-        final_peers = list(unique_peers)[:peer_amount]
+        final_peers = list(itertools.islice(unique_peers, peer_amount))
         logging.info("Starting with %d peers", len(final_peers))
         return ChainLivePeers(
             network=self.config.peers.network, polkachu_peer=last_data["polkachu_peer"], live_peers=final_peers
@@ -347,6 +511,26 @@ class Data:
         return ChainLivePeers(network=self.config.peers.network, polkachu_peer=data["polkachu_peer"], live_peers=None)
 
 
+class _NoCache:
+    """IPinfo SDK cache that stores nothing.
+
+    `_GEO_CACHE` already fronts every lookup, and the SDK's own TTLCache is not safe to share
+    between concurrent lookup batches.
+    """
+
+    def __contains__(self, key: object) -> bool:
+        return False
+
+    def __getitem__(self, key: str) -> dict:
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: dict) -> None:
+        pass
+
+    def __delitem__(self, key: str) -> None:
+        pass
+
+
 class Filter:
     """Filter peers based on location and latency criteria."""
 
@@ -354,127 +538,529 @@ class Filter:
         """Initialise filter with configuration."""
         self.config = config
 
+    @functools.cached_property
+    def ipinfo_handler(self) -> "ipinfo.Handler":
+        """IPinfo handler, built on first use and shared by every lookup batch."""
+        import ipinfo
+
+        return ipinfo.getHandler(self.config.peers.access_token, cache=_NoCache())
+
     def filter_peers(self, peers: list[str]) -> list[str]:
         """Apply all filters in sequence with timing metrics."""
         start_total = time.perf_counter()
-        peer_endpoints = [PeerEndpoint.from_string(peer) for peer in peers]
 
         start = time.perf_counter()
-        filtered_peers = self._filter_invalid_peers(peer_endpoints)
+        filtered_peers = self._filter_invalid_peers(peers)
+        filtered_peers = self._filter_duplicate_ips(filtered_peers)
         invalid_time = time.perf_counter() - start
         logging.debug("Invalid peer filtering took %.2f seconds", invalid_time)
 
+        # Country lookups and latency probes are independent network waits, so overlap them
         start = time.perf_counter()
-        filtered_peers = self._filter_by_country(filtered_peers)
-        country_time = time.perf_counter() - start
-        logging.debug("Country filtering took %.2f seconds", country_time)
-
-        start = time.perf_counter()
-        filtered_peers = self._filter_by_latency(filtered_peers)
-        latency_time = time.perf_counter() - start
-        logging.debug("Latency filtering took %.2f seconds", latency_time)
+        batch_size = COUNTRY_LOOKUP_BATCH_SIZE if self.locate_peers else max(1, len(filtered_peers))
+        if self.locate_peers:
+            # cached_property does not lock, so the shared lookup clients are built before the batches run
+            _ = self.geo_reader, self.ipinfo_handler
+        executor = ThreadPoolExecutor(max_workers=COUNTRY_LOOKUP_WORKERS)
+        try:
+            batches = [
+                (batch, executor.submit(self._filter_by_country, batch))
+                for batch in _batch_by_block(filtered_peers, batch_size)
+            ]
+
+            # Only peers a lookup has placed in a target country are probed, as soon as their batch is located
+            peer_latencies = self._filter_by_latency(
+                [future for _, future in batches], limit=self.config.peers.desired_count
+            )
+        finally:
+            # Batches not yet sent to IPinfo are not needed once enough peers have been found
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        outside_count = sum(
+            len(batch) - len(future.result())
+            for batch, future in batches
+            if future.done() and not future.cancelled() and not future.exception()
+        )
+        if outside_count > 0:
+            logging.info("Filtered out %d peers not in target country", outside_count)
+        country_latency_time = time.perf_counter() - start
+        logging.debug("Country and latency filtering took %.2f seconds", country_latency_time)
 
         total_time = time.perf_counter() - start_total
         logging.debug("Total filtering took %.2f seconds", total_time)
 
-        return [str(peer) for peer in filtered_peers][: self.config.peers.desired_count]
+        if self.config.use_cache and peer_latencies:
+            self._save_recent_peers(peer_latencies)
 
-    def _filter_invalid_peers(self, peers: list[PeerEndpoint]) -> list[PeerEndpoint]:
-        """Remove entities that we know are not presenting the correct p2p address.
+        return [str(peer) for peer, _ in peer_latencies][: self.config.peers.desired_count]
 
-        >>> 127.0.0.1, localhost, ::1
+    def recent_peers(self) -> list[str]:
+        """Return peers qualified by a recent run, if enough of them still meet the current criteria.
+
+        Peers are only reused when the earlier run was at least as strict about location, and
+        only those whose measured latency is within the current limit count. This runs before
+        the network is validated against Polkachu, so a hit skips discovery, location lookups
+        and latency probes entirely.
         """
-        filtered_peers = [peer for peer in peers if peer.ip not in ["127.0.0.1", "localhost", "::1"]]
+        if not self.config.use_cache:
+            return []
+
+        cache_file = CACHE_DIR / f"peers-{self.config.peers.network}.json"
+        try:
+            cached = json.loads(cache_file.read_text())
+            if time.time() - cached["timestamp"] >= RECENT_PEERS_TTL:
+                return []
+            cached_countries = frozenset(cached["target_countries"])
+            cached_peers = [peer for peer, latency in cached["peers"] if latency <= self.config.peers.max_latency]
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+
+        target_countries = self.config.peers.target_countries
+        if (
+            target_countries
+            and "*" not in target_countries
+            and not (cached_countries and "*" not in cached_countries and cached_countries <= target_countries)
+        ):
+            return []
+
+        if len(cached_peers) < self.config.peers.desired_count:
+            return []
+        return cached_peers[: self.config.peers.desired_count]
+
+    def _save_recent_peers(self, peer_latencies: list[tuple[PeerEndpoint, float]]) -> None:
+        """Persist the peers qualified by this run so that a warm rerun can skip discovery."""
+        cache_file = CACHE_DIR / f"peers-{self.config.peers.network}.json"
+        cached = {
+            "timestamp": time.time(),
+            # Peers that were never located qualify for any country, not the ones that were asked for
+            "target_countries": sorted(self.config.peers.target_countries) if self.locate_peers else ["*"],
+            "peers": [(str(peer), latency) for peer, latency in peer_latencies],
+        }
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(json.dumps(cached))
+        except OSError as e:
+            logging.debug("Unable to write cache file %s: %s", cache_file, e)
+
+    def _filter_invalid_peers(self, peers: list[str]) -> list[PeerEndpoint]:
+        """Parse peers in a single pass, removing malformed entries and those not presenting a real p2p address.
+
+        >>> 127.0.0.1, localhost, ::1, 0.0.0.0, 10.0.0.1, 224.0.0.1, ::ffff:192.168.1.10
+        """
+        filtered_peers = []
+        malformed_count = 0
+        for peer in peers:
+            try:
+                endpoint = PeerEndpoint.from_string(peer)
+            except ValueError as e:
+                malformed_count += 1
+                logging.debug("Skipping malformed peer: %s", e)
+                continue
+            if endpoint.ip not in LOCALHOST_ADDRESSES and _is_public_address(endpoint.ip):
+                filtered_peers.append(endpoint)
+
+        if malformed_count > 0:
+            logging.info("Filtered out %d malformed peers", malformed_count)
+        non_public_count = len(peers) - malformed_count - len(filtered_peers)
+        if non_public_count > 0:
+            logging.info("Filtered out %d localhost or private peers", non_public_count)
+        return filtered_peers
+
+    def _filter_duplicate_ips(self, peers: list[PeerEndpoint]) -> list[PeerEndpoint]:
+        """Keep only the first peer seen for each IP so that every host is located and probed once."""
+        seen_ips = set()
+        filtered_peers = []
+        for peer in peers:
+            if peer.ip not in seen_ips:
+                seen_ips.add(peer.ip)
+                filtered_peers.append(peer)
         if len(peers) - len(filtered_peers) > 0:
-            logging.info("Filtered out %d localhost peers", len(peers) - len(filtered_peers))
+            logging.debug("Filtered out %d peers sharing an IP with another peer", len(peers) - len(filtered_peers))
         return filtered_peers
 
+    @functools.cached_property
+    def locate_peers(self) -> bool:
+        """Whether peers need to be located at all, logging once why not."""
+        if not self.config.peers.target_countries or "*" in self.config.peers.target_countries:
+            logging.debug("No target countries set, skipping location lookup")
+            return False
+
+        if not self.config.peers.access_token and not self.config.peers.geo_database:
+            logging.warning("No IPinfo access token or geo database set, skipping location lookup")
+            return False
+
+        return True
+
     def _filter_by_country(self, peers: list[PeerEndpoint]) -> list[PeerEndpoint]:
         """Filter peers by geographic location using batch processing."""
-        handler = ipinfo.getHandler(self.config.peers.access_token)
+        if not self.locate_peers:
+            return peers
+
+        import ipinfo
+
         peer_map = {peer.ip: peer for peer in peers}
 
         try:
-            batch_details = handler.getBatchDetails(list(peer_map.keys()))
-            filtered_peers = []
-            for ip, details in batch_details.items():
-                country = details.get("country") if isinstance(details, dict) else details
-                if country in self.config.peers.target_countries:
-                    filtered_peers.append(peer_map[ip])
-                    logging.debug("Peer %s is in target country (%s)", peer_map[ip], country)
-        except ipinfo.error.APIError as e:
+            countries = self._lookup_countries(list(peer_map.keys()))
+        except (
+            ipinfo.error.APIError,
+            ipinfo.exceptions.RequestQuotaExceededError,
+            ipinfo.exceptions.TimeoutExceededError,
+            requests.RequestException,
+        ) as e:
             logging.warning("Batch location lookup failed: %s", e)
             return []
-        else:
-            if len(peers) - len(filtered_peers) > 0:
-                logging.info("Filtered out %d peers not in target country", len(peers) - len(filtered_peers))
-            return filtered_peers
 
-    def _filter_by_latency(self, peers: list[PeerEndpoint]) -> list[PeerEndpoint]:
-        """Filter peers by latency."""
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+        filtered_peers = []
+        for ip, country in countries.items():
+            if country in self.config.peers.target_countries:
+                filtered_peers.append(peer_map[ip])
+                if debug:
+                    logging.debug("Peer %s is in target country (%s)", peer_map[ip], country)
+
+        if len(peers) - len(filtered_peers) > 0:
+            logging.debug(
+                "Filtered out %d of %d peers not in target country", len(peers) - len(filtered_peers), len(peers)
+            )
+        return filtered_peers
+
+    @functools.cached_property
+    def geo_reader(self) -> "maxminddb.Reader | None":
+        """Local MMDB reader, opened on first use, or None when no usable database is configured."""
+        if not self.config.peers.geo_database:
+            return None
+
+        try:
+            import maxminddb
+        except ImportError:
+            logging.warning("maxminddb is not installed, ignoring --geo_database")
+            return None
+
+        try:
+            return maxminddb.open_database(self.config.peers.geo_database)
+        except (OSError, maxminddb.InvalidDatabaseError) as e:
+            logging.warning("Unable to open geo database %s: %s", self.config.peers.geo_database, e)
+            return None
+
+    def _lookup_countries(self, ips: list[str]) -> dict[str, str | None]:
+        """Resolve the country of each IP, only querying IPinfo for IPs missing from the cache.
+
+        Addresses in the same /24 (IPv4) or /48 (IPv6) block are assumed to share a country, so
+        a block is looked up through a single representative IP and cached as a whole.
+        """
+        if self.config.use_cache:
+            _load_geo_cache()
+
+        now = time.time()
+        countries = {}
+        pending: dict[str, list[str]] = {}
+
+        if self.geo_reader:
+            for ip in ips:
+                country = _mmdb_country(self.geo_reader, ip)
+                if country:
+                    countries[ip] = country
+            logging.debug("Resolved %d of %d IPs from the local geo database", len(countries), len(ips))
+
+        with _GEO_CACHE_LOCK:
+            for ip in ips:
+                if ip in countries:
+                    continue
+                block = _geo_block(ip)
+                for key in (ip, block):
+                    cached = _GEO_CACHE.get(key) if key else None
+                    if cached and now - cached[1] < GEO_CACHE_TTL:
+                        _GEO_CACHE.move_to_end(key)
+                        countries[ip] = cached[0]
+                        break
+                else:
+                    pending.setdefault(block or ip, []).append(ip)
+
+        if pending and not self.config.peers.access_token:
+            logging.debug("No IPinfo access token set, leaving %d IPs without a location", len(pending))
+        elif pending:
+            representatives = {members[0]: key for key, members in pending.items()}
+            logging.debug("Looking up %d IPs (%d resolved from cache)", len(representatives), len(countries))
+            batch_details = self.ipinfo_handler.getBatchDetails(
+                list(representatives), batch_size=IPINFO_BATCH_SIZE, timeout_total=IPINFO_BATCH_TIMEOUT
+            )
+            with _GEO_CACHE_LOCK:
+                for ip, details in batch_details.items():
+                    if ip not in representatives:
+                        continue
+                    # Bogon addresses are answered locally by the SDK as Details objects without a country
+                    country = details.get("country") if isinstance(details, dict) else getattr(details, "country", None)
+                    block = representatives[ip]
+                    for key in (block, *pending[block]):
+                        _GEO_CACHE[key] = (country, now)
+                        _GEO_CACHE.move_to_end(key)
+                    countries.update(dict.fromkeys(pending[block], country))
+                while len(_GEO_CACHE) > GEO_CACHE_MAXSIZE:
+                    _GEO_CACHE.popitem(last=False)
+            if self.config.use_cache:
+                _save_geo_cache()
+
+        return countries
+
+    def _filter_by_latency(
+        self,
+        candidates: Iterable[Future[list[PeerEndpoint]]],
+        limit: int | None = None,
+    ) -> list[tuple[PeerEndpoint, float]]:
+        """Filter peers by latency, probing each batch of candidates concurrently as soon as it is ready.
+
+        Probes complete roughly in order of latency, so once `limit` peers have passed the
+        remaining probes are abandoned rather than waited on.
+
+        Args:
+            candidates: Pending batches of peers still to be probed, such as the results of country lookups.
+            limit: Stop as soon as this many peers have passed.
+
+        Returns:
+            list[tuple[PeerEndpoint, float]]: Passing peers and their latency in milliseconds, sorted by latency.
+
+        """
         peer_latencies = []
         high_latency_peers = []
         closed_ports = []
         error_peers = []
+        probed_count = 0
 
-        for peer in peers:
-            try:
-                latency = ping3.ping(str(peer.ip), timeout=self.config.peers.max_latency / 1000, unit="ms")
-                if latency is None:
-                    logging.debug("ICMP appears blocked for %s, trying TCP", peer.ip)
-                    if self._test_port_open(peer):
-                        peer_latencies.append((peer, self.config.peers.max_latency))
-                        logging.debug("TCP connection successful to %s:%d", peer.ip, peer.port)
-                    else:
-                        closed_ports.append(peer)
-                        logging.debug("TCP connection failed to %s:%d", peer.ip, peer.port)
-                elif latency <= self.config.peers.max_latency:
-                    peer_latencies.append((peer, latency))
-                    logging.debug("Peer %s has good latency: %.2f ms", peer, latency)
-                else:
-                    high_latency_peers.append(peer)
-                    logging.debug("Peer %s latency too high: %.2f ms", peer, latency)
-            except (ping3.errors.HostUnknown, ping3.errors.PingError) as e:
-                error_peers.append(peer)
-                logging.debug("Ping error for %s: %s", peer.ip, e)
+        executor = ThreadPoolExecutor(max_workers=MAX_PROBE_WORKERS)
+        waiting = set(candidates)
+        probes: dict[Future[tuple[str, float | None]], PeerEndpoint] = {}
+        try:
+            while waiting or probes:
+                done, _ = wait(waiting | probes.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in waiting:
+                        waiting.remove(future)
+                        for peer in future.result():
+                            probes[executor.submit(self._probe_latency, peer)] = peer
+                            probed_count += 1
+                        continue
+
+                    peer = probes.pop(future)
+                    status, latency = future.result()
+                    match status:
+                        case "passed":
+                            peer_latencies.append((peer, latency))
+                        case "high_latency":
+                            high_latency_peers.append(peer)
+                        case "closed_port":
+                            closed_ports.append(peer)
+                        case "error":
+                            error_peers.append(peer)
+
+                if limit is not None and len(peer_latencies) >= limit:
+                    logging.debug("Found %d peers, skipping remaining probes", limit)
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
         peer_latencies.sort(key=itemgetter(1))
-        filtered_peers = [peer for peer, _ in peer_latencies]
 
-        if len(peers) - len(filtered_peers) > 0:
+        if probed_count - len(peer_latencies) > 0:
             msg = (
                 "Summary: %d total peers processed:\n"
                 "- %d passed\n"
                 "- %d high latency\n"
                 "- %d closed ports\n"
-                "- %d ping errors"
+                "- %d probe errors"
             )
             logging.debug(
-                msg, len(peers), len(filtered_peers), len(high_latency_peers), len(closed_ports), len(error_peers)
+                msg,
+                probed_count,
+                len(peer_latencies),
+                len(high_latency_peers),
+                len(closed_ports),
+                len(error_peers),
             )
 
-        return filtered_peers
+        return peer_latencies
+
+    def _probe_latency(self, peer: PeerEndpoint) -> tuple[str, float | None]:
+        """Probe a single peer and classify the result.
+
+        Returns:
+            tuple: The probe status ("passed", "high_latency", "closed_port" or "error") and latency in milliseconds.
+
+        """
+        timeout = self.config.peers.max_latency
 
-    def _test_port_open(self, peer: PeerEndpoint) -> bool:
-        """Test if a port is open on a peer in the event that the ping times out."""
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(1)
-                return s.connect_ex((peer.ip, peer.port)) == 0
-        except OSError:
-            return False
+            address = _resolve_host(peer.ip)
+        except OSError as e:
+            logging.debug("Unable to resolve %s: %s", peer.ip, e)
+            return "error", None
 
+        try:
+            latency = _tcp_latency(address, peer.port, timeout / 1000)
+        except TimeoutError:
+            logging.debug("Peer %s did not accept a connection within %.2f ms", peer, timeout)
+            return "high_latency", None
+        except ConnectionRefusedError:
+            logging.debug("TCP connection refused by %s:%d", peer.ip, peer.port)
+            return "closed_port", None
+        except OSError as e:
+            logging.debug("TCP connection error for %s: %s", peer, e)
+            return "error", None
+
+        if latency <= self.config.peers.max_latency:
+            logging.debug("Peer %s has good latency: %.2f ms", peer, latency)
+            return "passed", latency
+
+        logging.debug("Peer %s latency too high: %.2f ms", peer, latency)
+        return "high_latency", latency
+
+
+@functools.cache
+def _load_geo_cache() -> None:
+    """Seed the in-memory country cache from disk, once per process."""
+    now = time.time()
+    try:
+        entries = json.loads(GEO_CACHE_FILE.read_text())
+        with _GEO_CACHE_LOCK:
+            for key, (country, resolved_at) in entries.items():
+                if now - resolved_at < GEO_CACHE_TTL:
+                    _GEO_CACHE.setdefault(key, (country, resolved_at))
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        logging.debug("Unable to read cache file %s: %s", GEO_CACHE_FILE, e)
+
+
+def _save_geo_cache() -> None:
+    """Persist the in-memory country cache so later runs can skip IPinfo for known IPs."""
+    # Held while writing too, as concurrent lookup batches may each save the cache
+    with _GEO_CACHE_LOCK:
+        try:
+            GEO_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            GEO_CACHE_FILE.write_text(json.dumps(_GEO_CACHE))
+        except OSError as e:
+            logging.debug("Unable to write cache file %s: %s", GEO_CACHE_FILE, e)
 
-def main() -> None:
-    """Run peerscout against desired network."""
-    config = Config.initialise()
-    data = Data(config)
 
+def _geo_block(ip: str) -> str | None:
+    """Return the /24 (IPv4) or /48 (IPv6) network an IP belongs to, or None if it is not an IP address."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    prefix_length = 24 if address.version == 4 else 48  # noqa: PLR2004
+    return str(ipaddress.ip_network((address, prefix_length), strict=False))
+
+
+def _tcp_latency(address: str, port: int, timeout: float) -> float:
+    """Measure how long a peer takes to accept a TCP connection on its p2p port, in milliseconds."""
+    start = time.perf_counter()
+    with socket.create_connection((address, port), timeout=timeout):
+        return (time.perf_counter() - start) * 1000
+
+
+def _is_public_address(host: str) -> bool:
+    """Check that a peer address is globally routable unicast. Hostnames are assumed to be public."""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return True
+    # An IPv4-mapped IPv6 address is only as reachable as the IPv4 address it wraps
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+
+@functools.lru_cache(maxsize=GEO_CACHE_MAXSIZE)
+def _resolve_host(host: str) -> str:
+    """Return the IP address of a peer host, resolving hostnames through DNS only once per process."""
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)[0][4][0]
+    return host
+
+
+def _batch_by_block(peers: list[PeerEndpoint], size: int) -> list[list[PeerEndpoint]]:
+    """Split peers into batches of about `size`, never splitting a network block across two batches.
+
+    A block larger than `size` becomes a batch of its own, so each block is still located only once.
+    """
+
+    def block(peer: PeerEndpoint) -> str:
+        return _geo_block(peer.ip) or peer.ip
+
+    batches: list[list[PeerEndpoint]] = []
+    batch: list[PeerEndpoint] = []
+    for _, group in itertools.groupby(sorted(peers, key=block), key=block):
+        members = list(group)
+        if batch and len(batch) + len(members) > size:
+            batches.append(batch)
+            batch = []
+        batch.extend(members)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _mmdb_country(reader: "maxminddb.Reader", ip: str) -> str | None:
+    """Look up the ISO country code of an IP in a local MMDB, supporting both IPinfo and MaxMind layouts."""
+    try:
+        record = reader.get(ip)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    # IPinfo Lite keeps the ISO code in country_code and the full name in country
+    if isinstance(record.get("country_code"), str):
+        return record["country_code"]
+    country = record.get("country")
+    if isinstance(country, dict):
+        return country.get("iso_code")
+    return country if isinstance(country, str) else None
+
+
+def _close_matches(word: str, possibilities: list[str]) -> list[str]:
+    """Suggest the closest matches to `word`, using rapidfuzz when it is installed."""
+    try:
+        from rapidfuzz import fuzz, process
+    except ImportError:
+        import difflib
+
+        return difflib.get_close_matches(word, possibilities)
+
+    matches = process.extract(word, possibilities, scorer=fuzz.WRatio, limit=3, score_cutoff=70)
+    return [match for match, _, _ in matches]
+
+
+def _fetch_live_peers(config: Config) -> list[str]:
+    """Validate the network against Polkachu and retrieve its live peers, exiting on failure."""
+    with Data(config) as data:
+        # Only the final use of the results depends on the network being valid, so the chain details and a first
+        # live peers request are fetched alongside the chain list. Both stay quiet about failures, as the network
+        # may yet turn out to be unsupported.
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            chain_details_future = executor.submit(data.prefetch_chain_details)
+            live_peers_future = executor.submit(data.prefetch_live_peers)
+            return _validate_live_peers(config, data, chain_details_future, live_peers_future)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _validate_live_peers(
+    config: Config,
+    data: Data,
+    chain_details_future: "Future[None]",
+    live_peers_future: "Future[dict]",
+) -> list[str]:
+    """Check the network and its live peers service before retrieving live peers on top of the prefetched request."""
     try:
         valid_chains = data.fetch_valid_chains()
+        if config.peers.network not in valid_chains and config.use_cache:
+            # The cached list may predate a newly supported chain
+            valid_chains = data.fetch_valid_chains(refresh=True)
 
         if config.peers.network not in valid_chains:
-            close_matches = difflib.get_close_matches(config.peers.network, valid_chains)
+            close_matches = _close_matches(config.peers.network, valid_chains)
             msg = f"The network '{config.peers.network}' is not supported by Polkachu."
             if close_matches:
                 msg += f" Did you mean {', '.join(close_matches)}?"
@@ -484,6 +1070,8 @@ def main() -> None:
         sys.exit(1)
 
     try:
+        # A failed prefetch is not cached, so fetching again here reports the error now that it matters
+        chain_details_future.result()
         chain_details = data.fetch_chain_details()
 
         if not chain_details.polkachu_services["live_peers"]["active"]:
@@ -494,13 +1082,22 @@ def main() -> None:
         logging.error(e)  # noqa: TRY400
         sys.exit(1)
 
-    peers_data = data.fetch_live_peers()
-    peers = peers_data.live_peers
+    peers_data = data.fetch_live_peers(prefetched=live_peers_future)
+    return peers_data.live_peers
 
-    filtered_data = Filter(config)
-    try:
-        valid_peers = filtered_data.filter_peers(peers)
 
+def main() -> None:
+    """Run peerscout against desired network."""
+    config = Config.initialise()
+    peer_filter = Filter(config)
+
+    valid_peers = peer_filter.recent_peers()
+    if valid_peers:
+        logging.info("Reusing %d peers qualified by a recent run", len(valid_peers))
+    else:
+        valid_peers = peer_filter.filter_peers(_fetch_live_peers(config))
+
+    try:
         if valid_peers:
             match config.output_format:
                 case "list":